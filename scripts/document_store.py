@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Compact Columnar Document Store
+=================================================================
+
+Holds the document corpus as NumPy columns instead of a list of dicts:
+
+    • text columns     - one contiguous UTF-8 buffer + int64 offsets
+    • categoricals     - dictionary-encoded (court, jurisdiction, category,
+                         file_type ...): each distinct string is stored once,
+                         rows hold a small integer code
+    • numbers / dates  - typed NumPy arrays
+    • nulls            - optional per-column validity mask
+
+Rows are read through `DocumentView`, a `__slots__` view that behaves like the
+existing read-only dicts (`doc['title']`, `doc.get('court')`, `doc.items()`),
+so code written against `legal_documents` keeps working.
+
+Usage:
+    store = ColumnarDocumentStore.from_records(legal_documents, LEGAL_DOCUMENT_SCHEMA)
+    store[0]['title']
+    store.memory_usage()['bytes_per_document']
+"""
+
+import datetime
+import sys
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+TEXT = 'text'
+CATEGORY = 'category'
+INT = 'int'
+FLOAT = 'float'
+DATE = 'date'
+
+# Shape of the dicts built by load_real_legal_documents
+LEGAL_DOCUMENT_SCHEMA = {
+    'doc_id': TEXT,
+    'title': TEXT,
+    'content': TEXT,
+    'category': CATEGORY,
+    'court': CATEGORY,
+    'case_name': TEXT,
+    'jurisdiction': CATEGORY,
+    'word_count': INT,
+    'creation_date': DATE,
+}
+
+# Shape of the dicts built by quick_test.load_project_files
+PROJECT_FILE_SCHEMA = {
+    'document_id': INT,
+    'title': TEXT,
+    'full_text': TEXT,
+    'file_path': TEXT,
+    'file_type': CATEGORY,
+    'length': INT,
+    'category': CATEGORY,
+    'relevance_score': FLOAT,
+}
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _to_days(value):
+    """Date-like value -> days since epoch"""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    elif isinstance(value, np.datetime64):
+        return int(value.astype('datetime64[D]').astype(np.int64))
+    return (value - _EPOCH).days
+
+
+class DocumentStoreBuilder:
+    """Appends records straight into compact buffers (no per-row dicts kept)"""
+
+    def __init__(self, schema):
+        for name, kind in schema.items():
+            if kind not in (TEXT, CATEGORY, INT, FLOAT, DATE):
+                raise ValueError(f"Unknown column kind for '{name}': {kind}")
+        self.schema = dict(schema)
+        self._rows = 0
+        self._text = {name: (bytearray(), array('q', [0]))
+                      for name, kind in schema.items() if kind == TEXT}
+        self._categories = {name: {} for name, kind in schema.items() if kind == CATEGORY}
+        self._values = {
+            name: array('d' if kind == FLOAT else 'q')
+            for name, kind in schema.items() if kind != TEXT
+        }
+        self._nulls = {name: [] for name in schema}
+
+    def __len__(self):
+        return self._rows
+
+    def append(self, record):
+        row = self._rows
+        for name, kind in self.schema.items():
+            value = record.get(name) if hasattr(record, 'get') else record[name]
+            # NaN / NaT / pd.NA (how pandas spells missing values) are nulls too
+            if value is not None and pd.api.types.is_scalar(value) and pd.isna(value):
+                value = None
+            if value is None:
+                self._nulls[name].append(row)
+
+            if kind == TEXT:
+                buffer, offsets = self._text[name]
+                if value is not None:
+                    buffer += str(value).encode('utf-8')
+                offsets.append(len(buffer))
+            elif kind == CATEGORY:
+                if value is None:
+                    code = -1
+                else:
+                    code = self._categories[name].setdefault(str(value), len(self._categories[name]))
+                self._values[name].append(code)
+            elif kind == DATE:
+                self._values[name].append(0 if value is None else _to_days(value))
+            elif kind == FLOAT:
+                self._values[name].append(float('nan') if value is None else float(value))
+            else:
+                self._values[name].append(0 if value is None else int(value))
+        self._rows += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+        return self
+
+    def build(self):
+        columns = {}
+        for name, kind in self.schema.items():
+            if kind == TEXT:
+                buffer, offsets = self._text[name]
+                columns[name] = (np.frombuffer(bytes(buffer), dtype=np.uint8),
+                                 np.frombuffer(offsets, dtype=np.int64).copy())
+            elif kind == CATEGORY:
+                categories = list(self._categories[name])
+                codes = np.frombuffer(self._values[name], dtype=np.int64)
+                code_dtype = np.int8 if len(categories) < 2**7 else (
+                    np.int16 if len(categories) < 2**15 else np.int32)
+                columns[name] = (codes.astype(code_dtype), np.array(categories, dtype=object))
+            elif kind == DATE:
+                columns[name] = np.frombuffer(self._values[name], dtype=np.int64).astype('datetime64[D]')
+            elif kind == FLOAT:
+                columns[name] = np.frombuffer(self._values[name], dtype=np.float64).copy()
+            else:
+                columns[name] = np.frombuffer(self._values[name], dtype=np.int64).copy()
+
+        validity = {}
+        for name, null_rows in self._nulls.items():
+            if null_rows:
+                mask = np.ones(self._rows, dtype=bool)
+                mask[null_rows] = False
+                validity[name] = mask
+        return ColumnarDocumentStore(self.schema, self._rows, columns, validity)
+
+
+class DocumentView(Mapping):
+    """Read-only dict-style view of one row of a ColumnarDocumentStore"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._store.value(key, self._row)
+
+    def __iter__(self):
+        return iter(self._store.schema)
+
+    def __len__(self):
+        return len(self._store.schema)
+
+    def to_dict(self):
+        return {name: self[name] for name in self._store.schema}
+
+    def __repr__(self):
+        return f"DocumentView({self.to_dict()!r})"
+
+
+class ColumnarDocumentStore:
+    """Immutable columnar corpus with dict-style row access"""
+
+    def __init__(self, schema, n_rows, columns, validity=None):
+        self.schema = schema
+        self._n_rows = n_rows
+        self._columns = columns
+        self._validity = validity or {}
+
+    @classmethod
+    def from_records(cls, records, schema):
+        return DocumentStoreBuilder(schema).extend(records).build()
+
+    @classmethod
+    def from_dataframe(cls, df, schema):
+        return cls.from_records(df.to_dict('records'), schema)
+
+    def __len__(self):
+        return self._n_rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [DocumentView(self, i) for i in range(*row.indices(self._n_rows))]
+        if row < 0:
+            row += self._n_rows
+        if not 0 <= row < self._n_rows:
+            raise IndexError("document index out of range")
+        return DocumentView(self, row)
+
+    def __iter__(self):
+        for row in range(self._n_rows):
+            yield DocumentView(self, row)
+
+    def is_null(self, name, row):
+        mask = self._validity.get(name)
+        return mask is not None and not mask[row]
+
+    def value(self, name, row):
+        """Decode a single cell"""
+        kind = self.schema[name]
+        if self.is_null(name, row):
+            return None
+        if kind == TEXT:
+            data, offsets = self._columns[name]
+            return data[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8')
+        if kind == CATEGORY:
+            codes, categories = self._columns[name]
+            return categories[codes[row]]
+        if kind == DATE:
+            return self._columns[name][row].astype(object)
+        return self._columns[name][row].item()
+
+    def column(self, name):
+        """Whole column: NumPy array for numbers/dates/codes, list of str for text"""
+        kind = self.schema[name]
+        if kind == TEXT:
+            data, offsets = self._columns[name]
+            raw = data.tobytes()
+            return [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self._n_rows)]
+        if kind == CATEGORY:
+            return pd.Categorical.from_codes(self._columns[name][0], self._columns[name][1])
+        return self._columns[name]
+
+    def category_codes(self, name):
+        """(codes, categories) for a dictionary-encoded column, for vectorised filters"""
+        return self._columns[name]
+
+    def to_dataframe(self, columns=None, categorical=False):
+        """
+        Plain DataFrame with the same column types the list-of-dicts loaders
+        produced; `categorical=True` keeps dictionary-encoded columns as
+        pandas categoricals instead of strings.
+        """
+        data = {}
+        for name in columns or self.schema:
+            values = self.column(name)
+            mask = self._validity.get(name)
+            if self.schema[name] == CATEGORY and not categorical:
+                codes = self._columns[name][0]
+                values = np.asarray(values, dtype=object)
+                values[codes < 0] = None
+            elif mask is not None and self.schema[name] in (TEXT, INT):
+                values = pd.Series(values, dtype=object if self.schema[name] == TEXT else 'Int64')
+                values[~mask] = None
+            elif mask is not None and self.schema[name] == DATE:
+                values = values.copy()
+                values[~mask] = np.datetime64('NaT')
+            data[name] = values
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """Zero-copy-ish pyarrow Table (text buffers and dictionaries are reused)"""
+        import pyarrow as pa
+
+        arrays = {}
+        for name, kind in self.schema.items():
+            mask = self._validity.get(name)
+            null_bitmap = pa.array(mask).buffers()[1] if mask is not None else None
+            null_count = int((~mask).sum()) if mask is not None else 0
+            if kind == TEXT:
+                data, offsets = self._columns[name]
+                arrays[name] = pa.LargeStringArray.from_buffers(
+                    self._n_rows, pa.py_buffer(offsets), pa.py_buffer(data),
+                    null_bitmap, null_count)
+            elif kind == CATEGORY:
+                codes, categories = self._columns[name]
+                arrays[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(codes, mask=codes < 0), pa.array(list(categories), type=pa.string()))
+            else:
+                arrays[name] = pa.array(self._columns[name], mask=None if mask is None else ~mask)
+        return pa.table(arrays)
+
+    def memory_usage(self):
+        """Bytes held per column plus totals and bytes per document"""
+        usage = {}
+        for name, kind in self.schema.items():
+            column = self._columns[name]
+            if kind == TEXT:
+                nbytes = column[0].nbytes + column[1].nbytes
+            elif kind == CATEGORY:
+                nbytes = column[0].nbytes + column[1].nbytes + sum(
+                    sys.getsizeof(value) for value in column[1])
+            else:
+                nbytes = column.nbytes
+            if name in self._validity:
+                nbytes += self._validity[name].nbytes
+            usage[name] = nbytes
+
+        total = sum(usage.values())
+        return {
+            'columns': usage,
+            'total_bytes': total,
+            'documents': self._n_rows,
+            'bytes_per_document': total / self._n_rows if self._n_rows else 0.0,
+        }
+
+
+def estimate_dict_memory(records):
+    """Approximate bytes held by a list of flat dicts (for before/after comparisons)"""
+    total = sys.getsizeof(records)
+    seen = set()
+    for record in records:
+        total += sys.getsizeof(record)
+        for key, value in record.items():
+            for obj in (key, value):
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    total += sys.getsizeof(obj)
+    return total
+
+
+if __name__ == "__main__":
+    print("🗄️  COLUMNAR DOCUMENT STORE - MEMORY COMPARISON")
+    print("=" * 60)
+
+    courts = ["US Supreme Court", "Court of Appeals", "Federal District Court"]
+    records = [
+        {
+            'doc_id': f"legal_{i}",
+            'title': f"Opinion {i} on data privacy and contract enforcement",
+            'content': f"The Court holds in matter {i} that " + "reasonable expectation of privacy " * 8,
+            'category': "Legal Document",
+            'court': courts[i % 3],
+            'case_name': f"Plaintiff {i} v. Defendant {i}",
+            'jurisdiction': "Federal",
+            'word_count': 4000 + i,
+            'creation_date': f"2023-{(i % 12) + 1:02d}-15",
+        }
+        for i in range(100_000)
+    ]
+
+    store = ColumnarDocumentStore.from_records(records, LEGAL_DOCUMENT_SCHEMA)
+    usage = store.memory_usage()
+    dict_bytes = estimate_dict_memory(records)
+
+    print(f"📄 Documents: {len(store):,}")
+    print(f"🐍 List of dicts: {dict_bytes / len(records):,.0f} bytes/document")
+    print(f"🗄️  Columnar store: {usage['bytes_per_document']:,.0f} bytes/document")
+    print(f"📉 Reduction: {dict_bytes / usage['total_bytes']:.1f}x")
+    print(f"\n🔎 store[1]['court'] = {store[1]['court']!r}")
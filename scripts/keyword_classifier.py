@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Compiled Keyword Classifier
+=============================================================
+
+One declarative rule table drives every keyword classification that used to be
+a chain of independent substring checks:
+
+    • file categories            (quick_test.categorize_file)
+    • query intent / tech focus  (SMART_QUERY query analysis)
+    • document category          (documents table CASE WHEN ladder)
+    • primary theme / concepts   (generate_intelligent_summary)
+
+Each requested set of groups is compiled once into a plan with one keyword
+matcher per text scope (whole text, or only the first N characters for
+`within` rules). Keywords are looked up lazily, so a 'first' group stops at
+the first rule that fires exactly like the CASE ladders it replaces. For long
+texts checked against many keywords, a `pyahocorasick` automaton scans the
+text once instead, and stops as soon as every keyword has been seen.
+`to_sql_case` renders a rule group as a BigQuery CASE expression for callers
+that classify on the SQL side.
+
+Usage:
+    classify_text(query, groups=['query_intent', 'technology_focus'])
+    CLASSIFIER.classify_batch(df['full_text'])
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# keywords:       matched anywhere in the (lowercased) text
+# exclude:        the rule does not fire if any of these is present
+# filename:       matched anywhere in the lowercased filename instead of the text
+# suffix:         matched against the end of the lowercased filename
+# within:         keywords are only looked for in the first N characters
+# case_sensitive: keywords/exclude are matched against the original text
+Rule = namedtuple('Rule', ['label', 'keywords', 'exclude', 'filename', 'suffix', 'within',
+                           'case_sensitive'],
+                  defaults=((), (), (), (), None, False))
+
+# mode 'first': first matching rule wins (CASE WHEN ladder), else default
+# mode 'all':   every matching rule's label, in rule order (one entry per rule)
+RuleGroup = namedtuple('RuleGroup', ['mode', 'rules', 'default'], defaults=(None,))
+
+RULE_TABLE = {
+    'file_category': RuleGroup('first', [
+        Rule('Python Code', ['import '], filename=['.py'], within=200, case_sensitive=True),
+        Rule('SQL Scripts', ['select'], filename=['.sql']),
+        Rule('Documentation', filename=['.md'], suffix=['.txt']),
+        Rule('Configuration', filename=['.json']),
+        Rule('Jupyter Notebook', filename=['.ipynb']),
+    ], 'General Files'),
+
+    'document_category': RuleGroup('first', [
+        Rule('Python Development', ['python']),
+        Rule('JavaScript Development', ['javascript']),
+        Rule('Java Development', ['java'], exclude=['javascript']),
+        Rule('C++ Development', ['c++', 'c#']),
+        Rule('Database & SQL', ['sql', 'database']),
+        Rule('Web Frontend', ['html', 'css']),
+        Rule('Algorithms & Data Structures', ['algorithm', 'data-structure']),
+    ], 'General Programming'),
+
+    'query_intent': RuleGroup('first', [
+        Rule('TROUBLESHOOTING', ['error', 'problem', 'issue', 'bug', 'fix']),
+        Rule('OPTIMIZATION', ['performance', 'optimize', 'speed', 'slow']),
+        Rule('LEARNING', ['best practice', 'recommend', 'guide', 'tutorial']),
+        Rule('SECURITY', ['security', 'vulnerability', 'secure']),
+    ], 'UNKNOWN'),
+
+    # One rule per SMART_QUERY tech keyword: 'database' and 'sql' both append
+    'technology_focus': RuleGroup('all', [
+        Rule('Python Development', ['python']),
+        Rule('JavaScript Development', ['javascript']),
+        Rule('Java Development', ['java']),
+        Rule('Database & SQL', ['database']),
+        Rule('Database & SQL', ['sql']),
+        Rule('Algorithms & Data Structures', ['algorithm']),
+    ]),
+
+    'primary_theme': RuleGroup('first', [
+        Rule('Problem Resolution', ['error', 'problem']),
+        Rule('Performance Enhancement', ['optimization', 'performance']),
+        Rule('Educational Content', ['tutorial', 'guide']),
+        Rule('Best Practices', ['best practice', 'recommend']),
+        Rule('Security Guidance', ['security', 'vulnerability']),
+    ], 'General Technical'),
+
+    'technical_concepts': RuleGroup('all', [
+        Rule('Python', ['python']),
+        Rule('JavaScript', ['javascript']),
+        Rule('Database', ['database']),
+        Rule('Algorithms', ['algorithm']),
+        Rule('Security', ['security']),
+        Rule('Performance', ['performance']),
+        Rule('Optimization', ['optimization']),
+    ]),
+}
+
+# problem_type / urgency that SMART_QUERY attaches to each intent
+INTENT_PROFILES = {
+    'TROUBLESHOOTING': ('ERROR_RESOLUTION', 'HIGH'),
+    'OPTIMIZATION': ('PERFORMANCE_ENHANCEMENT', 'HIGH'),
+    'LEARNING': ('KNOWLEDGE_ACQUISITION', 'STANDARD'),
+    'SECURITY': ('SECURITY_GUIDANCE', 'CRITICAL'),
+    'UNKNOWN': ('GENERAL', 'STANDARD'),
+}
+
+# An automaton pass only beats per-keyword `in` scans (which stop at the first
+# occurrence, in C) for many keywords over long texts
+AUTOMATON_MIN_KEYWORDS = 24
+AUTOMATON_MIN_CHARS = 16_384
+
+
+def _as_text(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    return str(value)
+
+
+class KeywordMatcher:
+    """
+    Keyword presence for one text scope; case-insensitive unless `case_sensitive`.
+
+    `hits(text)` returns something that answers `keyword in hits`: the prepared
+    text itself (lazy `in` lookups), or the set of keywords found by a single
+    automaton pass when the text and keyword set are large enough to pay for it.
+    """
+
+    def __init__(self, keywords, case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.keywords = sorted(set(keywords) if case_sensitive else {keyword.lower() for keyword in keywords})
+        self._automaton = None
+        if ahocorasick is not None and len(self.keywords) >= AUTOMATON_MIN_KEYWORDS:
+            self._automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword, index)
+            self._automaton.make_automaton()
+
+    def hits(self, text):
+        text = text if self.case_sensitive else text.lower()
+        if self._automaton is None or len(text) < AUTOMATON_MIN_CHARS:
+            return text
+        return self._scan(text)
+
+    def hits_many(self, texts):
+        """hits() for a whole column"""
+        if not self.case_sensitive:
+            texts = [text.lower() for text in texts]
+        if self._automaton is None:
+            return texts
+        return [self._scan(text) if len(text) >= AUTOMATON_MIN_CHARS else text for text in texts]
+
+    def _scan(self, text):
+        """Keywords present in `text`, stopping once every keyword has been seen"""
+        found = set()
+        for _, index in self._automaton.iter(text):
+            found.add(self.keywords[index])
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+
+class _GroupPlan:
+    """The rules of one set of groups, compiled with one matcher per text scope"""
+
+    def __init__(self, rule_table, groups):
+        self.groups = []
+        keywords_by_scope = {}
+        for name in groups:
+            group = rule_table[name]
+            rules = []
+            for rule in group.rules:
+                scope = (rule.within, rule.case_sensitive)
+                fold = (lambda keyword: keyword) if rule.case_sensitive else str.lower
+                keywords = tuple(fold(keyword) for keyword in rule.keywords)
+                exclude = tuple(fold(keyword) for keyword in rule.exclude)
+                if keywords or exclude:
+                    keywords_by_scope.setdefault(scope, set()).update(keywords, exclude)
+                rules.append((rule.label, keywords, exclude,
+                              tuple(keyword.lower() for keyword in rule.filename),
+                              tuple(suffix.lower() for suffix in rule.suffix), scope))
+            self.groups.append((name, group.mode, group.default, rules))
+        self.matchers = {scope: KeywordMatcher(keywords, case_sensitive=scope[1])
+                         for scope, keywords in keywords_by_scope.items()}
+
+    def evaluate(self, text, filename=None):
+        text = text or ''
+        filename = filename.lower() if filename else ''
+        scoped_hits = {}
+        result = {}
+        for name, mode, default, rules in self.groups:
+            labels = []
+            for label, keywords, exclude, filename_keywords, suffixes, scope in rules:
+                fired = False
+                if filename and (any(keyword in filename for keyword in filename_keywords)
+                                 or (suffixes and filename.endswith(suffixes))):
+                    fired = True
+                elif keywords:
+                    hits = scoped_hits.get(scope)
+                    if hits is None:
+                        within = scope[0]
+                        hits = scoped_hits[scope] = self.matchers[scope].hits(
+                            text if within is None else text[:within])
+                    for keyword in keywords:
+                        if keyword in hits:
+                            fired = True
+                            break
+                    if fired:
+                        for keyword in exclude:
+                            if keyword in hits:
+                                fired = False
+                                break
+                if fired:
+                    if mode == 'first':
+                        result[name] = label
+                        break
+                    labels.append(label)
+            else:
+                result[name] = default if mode == 'first' else labels
+        return result
+
+
+    def evaluate_batch(self, texts, filenames):
+        """
+        Column-at-a-time evaluate(): each rule checks its keywords only against
+        the rows no earlier rule has claimed, so a 'first' group costs the same
+        substring checks as its ladder without per-row interpreter overhead.
+        Returns {group: [label per row]}.
+        """
+        n_rows = len(texts)
+        filenames = [filename.lower() if filename else '' for filename in filenames]
+        scoped_hits = {}
+
+        def hits_for(scope):
+            column = scoped_hits.get(scope)
+            if column is None:
+                matcher, within = self.matchers[scope], scope[0]
+                column = scoped_hits[scope] = matcher.hits_many(
+                    texts if within is None else [text[:within] for text in texts])
+            return column
+
+        def fired_rows(rule, rows):
+            _, keywords, exclude, filename_keywords, suffixes, scope = rule
+            fired = set()
+            if filename_keywords or suffixes:
+                fired.update(row for row in rows if filenames[row] and (
+                    any(keyword in filenames[row] for keyword in filename_keywords)
+                    or (suffixes and filenames[row].endswith(suffixes))))
+            if keywords:
+                hits = hits_for(scope)
+                pending = [row for row in rows if row not in fired] if fired else rows
+                matched = set()
+                for keyword in keywords:
+                    found = [row for row in pending if keyword in hits[row]]
+                    if found:
+                        matched.update(found)
+                        pending = [row for row in pending if row not in matched]
+                for keyword in exclude:
+                    matched.difference_update([row for row in matched if keyword in hits[row]])
+                fired |= matched
+            return fired
+
+        columns = {}
+        for name, mode, default, rules in self.groups:
+            if mode == 'first':
+                labels = [default] * n_rows
+                remaining = list(range(n_rows))
+                for rule in rules:
+                    if not remaining:
+                        break
+                    fired = fired_rows(rule, remaining)
+                    if fired:
+                        for row in fired:
+                            labels[row] = rule[0]
+                        remaining = [row for row in remaining if row not in fired]
+            else:
+                labels = [[] for _ in range(n_rows)]
+                every_row = range(n_rows)
+                for rule in rules:
+                    for row in fired_rows(rule, every_row):
+                        labels[row].append(rule[0])
+            columns[name] = labels
+        return columns
+
+
+class KeywordClassifier:
+    """Evaluates a rule table, compiling one plan per requested set of groups"""
+
+    def __init__(self, rule_table=RULE_TABLE):
+        self.rule_table = rule_table
+        self._plans = {}
+
+    def plan(self, groups=None):
+        key = tuple(groups or self.rule_table)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = _GroupPlan(self.rule_table, key)
+        return plan
+
+    def classify(self, text, filename=None, groups=None):
+        """{group: label (mode 'first') or [labels] (mode 'all')} for one text"""
+        return self.plan(groups).evaluate(text, filename)
+
+    def classify_batch(self, texts, filenames=None, groups=None):
+        """
+        Classify a whole column of documents with one compiled plan, a rule at
+        a time (see _GroupPlan.evaluate_batch). Returns a DataFrame with one
+        column per group, aligned with `texts`.
+        """
+        plan = self.plan(groups)
+        index = texts.index if isinstance(texts, pd.Series) else None
+        values = texts.tolist() if isinstance(texts, pd.Series) else list(texts)
+        if filenames is None:
+            filenames = [None] * len(values)
+        elif isinstance(filenames, pd.Series):
+            filenames = filenames.tolist()
+        columns = plan.evaluate_batch([_as_text(text) for text in values], filenames)
+        return pd.DataFrame(columns, index=index)
+
+    def to_sql_case(self, group_name, column_sql):
+        """Render a rule group as a BigQuery expression over `column_sql`"""
+        group = self.rule_table[group_name]
+
+        def contains(keyword):
+            return f"CONTAINS_SUBSTR(LOWER({column_sql}), '{keyword}')"
+
+        def contains_exact(keyword):
+            return f"STRPOS({column_sql}, '{keyword}') > 0"
+
+        def condition(rule):
+            if rule.filename or rule.suffix or rule.within is not None:
+                raise ValueError(f"Group '{group_name}' uses filename/position rules that have no SQL form")
+            match = contains_exact if rule.case_sensitive else contains
+            sql = ' OR '.join(match(keyword) for keyword in rule.keywords)
+            if rule.exclude:
+                sql = f"({sql}) AND NOT ({' OR '.join(match(keyword) for keyword in rule.exclude)})"
+            return sql
+
+        def quote(label):
+            return "'" + label.replace("'", "\\'") + "'"
+
+        if group.mode == 'first':
+            branches = '\n'.join(f"    WHEN {condition(rule)} THEN {quote(rule.label)}" for rule in group.rules)
+            default = quote(group.default) if group.default is not None else 'NULL'
+            return f"CASE\n{branches}\n    ELSE {default}\nEND"
+
+        items = ',\n'.join(
+            f"    CASE WHEN {condition(rule)} THEN {quote(rule.label)} ELSE NULL END" for rule in group.rules)
+        return f"ARRAY(SELECT label FROM UNNEST([\n{items}\n]) AS label WHERE label IS NOT NULL)"
+
+
+CLASSIFIER = KeywordClassifier()
+
+
+def classify_text(text, filename=None, groups=None):
+    """Classify one text with the shared rule table"""
+    return CLASSIFIER.classify(text, filename=filename, groups=groups)
+
+
+def analyze_query(natural_language_query):
+    """SMART_QUERY's query_analysis dict, from one pass over the query"""
+    result = CLASSIFIER.classify(natural_language_query, groups=['query_intent', 'technology_focus'])
+    problem_type, urgency = INTENT_PROFILES[result['query_intent']]
+    return {
+        'intent': result['query_intent'],
+        'technology_focus': result['technology_focus'],
+        'problem_type': problem_type,
+        'urgency': urgency,
+        'search_strategy': 'HYBRID',
+    }
+
+
+def _original_ladders(text):
+    """document_category + primary_theme as the notebooks' substring ladders (benchmark baseline)"""
+    text = text.lower()
+    if 'python' in text:
+        category = 'Python Development'
+    elif 'javascript' in text:
+        category = 'JavaScript Development'
+    elif 'java' in text and 'javascript' not in text:
+        category = 'Java Development'
+    elif 'c++' in text or 'c#' in text:
+        category = 'C++ Development'
+    elif 'sql' in text or 'database' in text:
+        category = 'Database & SQL'
+    elif 'html' in text or 'css' in text:
+        category = 'Web Frontend'
+    elif 'algorithm' in text or 'data-structure' in text:
+        category = 'Algorithms & Data Structures'
+    else:
+        category = 'General Programming'
+
+    if 'error' in text or 'problem' in text:
+        theme = 'Problem Resolution'
+    elif 'optimization' in text or 'performance' in text:
+        theme = 'Performance Enhancement'
+    elif 'tutorial' in text or 'guide' in text:
+        theme = 'Educational Content'
+    elif 'best practice' in text or 'recommend' in text:
+        theme = 'Best Practices'
+    elif 'security' in text or 'vulnerability' in text:
+        theme = 'Security Guidance'
+    else:
+        theme = 'General Technical'
+    return category, theme
+
+
+def _original_categorize_file(filename, content):
+    """quick_test.categorize_file before the rule table (benchmark baseline)"""
+    filename_lower = filename.lower()
+    content_lower = content.lower()
+    if '.py' in filename_lower or 'import ' in content[:200]:
+        return 'Python Code'
+    elif '.sql' in filename_lower or 'select' in content_lower:
+        return 'SQL Scripts'
+    elif '.md' in filename_lower or filename_lower.endswith('.txt'):
+        return 'Documentation'
+    elif '.json' in filename_lower:
+        return 'Configuration'
+    elif '.ipynb' in filename_lower:
+        return 'Jupyter Notebook'
+    return 'General Files'
+
+
+def _best_of(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    import random
+
+    print("🏷️  COMPILED KEYWORD CLASSIFIER")
+    print("=" * 60)
+    print(f"⚙️  Automaton: {'pyahocorasick' if ahocorasick else 'not installed (lazy substring checks only)'}, "
+          f"used for >= {AUTOMATON_MIN_KEYWORDS} keywords over >= {AUTOMATON_MIN_CHARS:,} chars")
+
+    for query in ["python error handling best practices", "database performance optimization",
+                  "javascript security vulnerability"]:
+        print(f"\n🔎 {query!r}\n   {analyze_query(query)}")
+
+    # Benchmarks against the ladders the rule table replaced; labels must match exactly
+    rng = random.Random(0)
+    words = ("how do i fix a python import error when reading from the database performance "
+             "tuning guide for java services and sql queries best practice recommendations "
+             "html css layouts lorem ipsum dolor sit amet the of and").split()
+    corpus = pd.Series([' '.join(rng.choice(words) for _ in range(rng.randint(5, 40))) + f" #{i}"
+                        for i in range(60_000)])
+    groups = ['document_category', 'primary_theme']
+    compiled_s, labels = _best_of(lambda: CLASSIFIER.classify_batch(corpus, groups=groups))
+    ladder_s, expected = _best_of(lambda: [_original_ladders(text) for text in corpus])
+    assert list(zip(labels['document_category'], labels['primary_theme'])) == expected
+    print(f"\n📊 {len(corpus):,} documents, {' + '.join(groups)}: "
+          f"{compiled_s:.2f}s compiled vs {ladder_s:.2f}s original ladders (identical labels)")
+
+    # No 'import ' / 'select': the worst case, where the whole file has to be checked
+    file_words = [word for word in words if word not in ('import', 'select')]
+    big_file = ''.join(rng.choice(file_words) + ' ' for _ in range(200_000))[:1_000_000]
+    for filename in ['notes.md', 'analysis.py']:
+        compiled_s, label = _best_of(
+            lambda: classify_text(big_file, filename=filename, groups=['file_category'])['file_category'])
+        ladder_s, expected = _best_of(lambda: _original_categorize_file(filename, big_file))
+        assert label == expected
+        print(f"📄 categorize_file({filename!r}, 1 MB): {compiled_s * 1000:.2f} ms compiled vs "
+              f"{ladder_s * 1000:.2f} ms original -> {label}")
+
+    every_group = list(RULE_TABLE)
+    compiled_s, _ = _best_of(lambda: classify_text(big_file, groups=every_group))
+    ladder_s, _ = _best_of(lambda: [keyword in big_file.lower() for group in RULE_TABLE.values()
+                                    for rule in group.rules for keyword in rule.keywords])
+    print(f"📚 All {len(every_group)} groups over 1 MB: {compiled_s * 1000:.2f} ms compiled vs "
+          f"{ladder_s * 1000:.2f} ms checking every keyword separately")
+
+    print(f"\n🧾 SQL for primary_theme:\n{CLASSIFIER.to_sql_case('primary_theme', 'full_text')}")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Query Load Generator
+======================================================
+
+Drives the search and analysis paths under concurrent load instead of the
+handful of sequential queries in `run_quick_test` / `comprehensive_search_demo`.
+
+Query sources:
+    • a recorded query log (plain text, one query per line, or JSONL with "query")
+    • Zipf-distributed queries over a vocabulary (a few hot queries, long tail)
+
+Load shapes:
+    • open loop  - arrivals at a target QPS (uniform or Poisson), independent of
+                   how fast the system answers; exposes queueing delay
+    • closed loop - a fixed number of concurrent clients issuing back-to-back
+
+Targets are plain callables taking the query text, so the real
+`execute_vector_search`, `search_test_documents` and `SMART_QUERY` can be passed
+in directly. Those functions catch their own exceptions and return `[]` / `None`
+instead, so each target is paired with an `is_error(result)` predicate
+(`TARGET_ERROR_CHECKS`). For offline runs `LocalBackend` stands in for BigQuery
+with configurable latency and a fixed number of execution slots.
+
+Each ramp step reports throughput, queueing delay, service time and tail
+response time; the step where throughput stops tracking offered load marks
+saturation. Queueing delay covers waiting for a load-generator worker and, for
+backends that call `mark_service_start()` when they get an execution slot,
+waiting for that slot too.
+
+Usage:
+    python scripts/load_generator.py --target vector_search --qps 5,10,20,40,80
+    python scripts/load_generator.py --log queries.txt --concurrency 1,2,4,8,16
+    python scripts/load_generator.py --backend quick_test --qps 1,2,4
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUERIES = [
+    "constitutional privacy rights digital communications",
+    "patent enforcement intellectual property litigation",
+    "corporate governance fiduciary duty shareholders",
+    "software license agreement enforcement",
+    "data governance compliance requirements",
+    "bigquery",
+    "competition",
+    "python",
+    "data",
+    "smart document",
+    "python error handling best practices",
+    "database performance optimization",
+    "security vulnerability in web frontend",
+]
+
+# The real search paths swallow their exceptions and return these instead
+TARGET_ERROR_CHECKS = {
+    'vector_search': lambda result: not result,       # execute_vector_search -> []
+    'test_search': lambda result: result is None,     # search_test_documents -> None
+    'smart_query': lambda result: result is None,     # SMART_QUERY -> None
+}
+
+_request_timing = threading.local()
+
+
+def mark_service_start():
+    """Called by a backend when a request leaves its queue and starts executing"""
+    _request_timing.service_start = time.perf_counter()
+
+
+def load_query_log(path):
+    """Queries from a log file: plain text lines or JSONL records with a "query" field"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                try:
+                    queries.append(json.loads(line)['query'])
+                    continue
+                except (json.JSONDecodeError, KeyError):
+                    pass
+            queries.append(line)
+    return queries
+
+
+def zipf_queries(vocabulary, n, exponent=1.1, seed=0):
+    """`n` queries drawn from `vocabulary` with Zipf(rank) popularity"""
+    ranks = np.arange(1, len(vocabulary) + 1, dtype=np.float64)
+    weights = ranks ** -exponent
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vocabulary), size=n, p=weights / weights.sum())
+    return [vocabulary[i] for i in picks]
+
+
+class LocalBackend:
+    """
+    Offline stand-in for the BigQuery-backed search paths.
+
+    `capacity` concurrent executions are allowed (like slots on a server);
+    further requests wait for a slot. Service time is `base_latency` times a
+    per-path multiplier times log-normal jitter, and `error_rate` injects failures.
+    """
+
+    PATH_COST = {
+        'execute_vector_search': 1.0,
+        'search_test_documents': 0.6,
+        'SMART_QUERY': 3.0,
+    }
+
+    def __init__(self, base_latency=0.05, jitter=0.3, capacity=8, error_rate=0.0, seed=0):
+        self.base_latency = base_latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._slots = threading.BoundedSemaphore(capacity)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _serve(self, path):
+        with self._lock:
+            service_time = self.base_latency * self.PATH_COST[path] * self._rng.lognormvariate(0, self.jitter)
+            fail = self._rng.random() < self.error_rate
+        with self._slots:
+            mark_service_start()
+            time.sleep(service_time)
+        if fail:
+            raise RuntimeError(f"Injected {path} failure")
+
+    def execute_vector_search(self, query_text, top_k=5):
+        self._serve('execute_vector_search')
+        return [{'doc_id': f"legal_{i}", 'title': query_text, 'similarity_score': 1.0 - i * 0.1}
+                for i in range(top_k)]
+
+    def search_test_documents(self, query_text, top_k=3):
+        self._serve('search_test_documents')
+        return pd.DataFrame({'document_id': range(1, top_k + 1), 'similarity_score': [3.0] * top_k})
+
+    def SMART_QUERY(self, natural_language_query, result_limit=10, **kwargs):
+        self._serve('SMART_QUERY')
+        return {'query': natural_language_query, 'total_results_found': result_limit}
+
+
+def backend_targets(backend):
+    """Target callables (query_text -> result) for every search/analysis path"""
+    return {
+        'vector_search': lambda q: backend.execute_vector_search(q, top_k=5),
+        'test_search': lambda q: backend.search_test_documents(q, top_k=3),
+        'smart_query': lambda q: backend.SMART_QUERY(q, result_limit=8),
+    }
+
+
+def quick_test_targets():
+    """Targets for the importable quick_test search path (needs BigQuery credentials)"""
+    import quick_test
+    return {'test_search': lambda q: quick_test.search_test_documents(q, top_k=3)}
+
+
+def _timed_call(target, query, scheduled, records, lock, is_error=None):
+    _request_timing.service_start = None
+    start = time.perf_counter()
+    try:
+        result = target(query)
+        ok = not (is_error is not None and is_error(result))
+    except Exception:
+        ok = False
+    end = time.perf_counter()
+    # Targets that do not report their own queueing start service on call entry
+    service_start = _request_timing.service_start or start
+    with lock:
+        records.append((scheduled, service_start, end, ok))
+
+
+def run_open_loop(target, queries, qps, duration, arrival='poisson', max_in_flight=256, seed=0,
+                  is_error=None):
+    """
+    Issue queries at `qps` for `duration` seconds regardless of response times.
+    Queueing delay is the time between a request's scheduled arrival and the
+    moment it starts executing.
+    """
+    rng = random.Random(seed)
+    records, lock = [], threading.Lock()
+    begin = time.perf_counter()
+    next_arrival = begin
+    issued = 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while next_arrival - begin < duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            query = queries[issued % len(queries)]
+            pool.submit(_timed_call, target, query, next_arrival, records, lock, is_error)
+            issued += 1
+            gap = rng.expovariate(qps) if arrival == 'poisson' else 1.0 / qps
+            next_arrival += gap
+
+    return _summarize(records, begin, offered_qps=qps, duration=duration)
+
+
+def run_closed_loop(target, queries, concurrency, duration, is_error=None):
+    """`concurrency` clients each issue their next query as soon as the last returns"""
+    records, lock = [], threading.Lock()
+    begin = time.perf_counter()
+    counter = itertools.count()
+    counter_lock = threading.Lock()
+
+    def client():
+        while time.perf_counter() - begin < duration:
+            with counter_lock:
+                index = next(counter)
+            _timed_call(target, queries[index % len(queries)], time.perf_counter(), records, lock,
+                        is_error)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = _summarize(records, begin, offered_qps=None, duration=duration)
+    summary['concurrency'] = concurrency
+    return summary
+
+
+def _summarize(records, begin, offered_qps, duration):
+    if not records:
+        return {'offered_qps': offered_qps, 'requests': 0}
+
+    scheduled, service_start, end, ok = (np.array(column) for column in zip(*records))
+    service = (end - service_start) * 1000
+    queue_delay = np.maximum(service_start - scheduled, 0) * 1000
+    response = (end - scheduled) * 1000
+    wall = end.max() - begin
+
+    return {
+        'offered_qps': offered_qps,
+        'requests': len(records),
+        'arrival_qps': len(records) / duration,
+        'throughput_qps': ok.sum() / wall if wall > 0 else 0.0,
+        'error_rate': 1 - ok.mean(),
+        'queue_delay_mean_ms': queue_delay.mean(),
+        'queue_delay_p95_ms': np.percentile(queue_delay, 95),
+        'service_p50_ms': np.percentile(service, 50),
+        'service_p95_ms': np.percentile(service, 95),
+        'response_p50_ms': np.percentile(response, 50),
+        'response_p95_ms': np.percentile(response, 95),
+        'response_p99_ms': np.percentile(response, 99),
+    }
+
+
+def ramp_load(target, queries, qps_steps=None, concurrency_steps=None, step_duration=10.0,
+              arrival='poisson', is_error=None, verbose=True):
+    """
+    Step through rising load levels and return one report row per step.
+    Use `qps_steps` for open-loop or `concurrency_steps` for closed-loop ramps.
+    """
+    if (qps_steps is None) == (concurrency_steps is None):
+        raise ValueError("Pass exactly one of qps_steps or concurrency_steps")
+
+    rows = []
+    for level in qps_steps or concurrency_steps:
+        if qps_steps is not None:
+            row = run_open_loop(target, queries, level, step_duration, arrival=arrival,
+                                is_error=is_error)
+        else:
+            row = run_closed_loop(target, queries, level, step_duration, is_error=is_error)
+        rows.append(row)
+        if verbose:
+            label = f"{level} qps" if qps_steps is not None else f"{level} clients"
+            print(f"   📈 {label:>12}: {row.get('throughput_qps', 0):7.1f} qps served, "
+                  f"p99 {row.get('response_p99_ms', 0):7.1f} ms, "
+                  f"queue {row.get('queue_delay_mean_ms', 0):7.1f} ms, "
+                  f"service p50 {row.get('service_p50_ms', 0):6.1f} ms")
+    return pd.DataFrame(rows)
+
+
+def saturation_point(report, tolerance=0.9):
+    """
+    Saturation throughput (max served QPS) and the first offered load the
+    system could no longer keep up with (served < tolerance * arrivals).
+    """
+    saturation_qps = float(report['throughput_qps'].max())
+    knee = None
+    if report['offered_qps'].notna().all():
+        behind = report[report['throughput_qps'] < tolerance * report['arrival_qps']]
+        if len(behind):
+            knee = float(behind['offered_qps'].iloc[0])
+    return {'saturation_throughput_qps': saturation_qps, 'first_saturated_offered_qps': knee}
+
+
+def _parse_steps(value):
+    return [float(v) if '.' in v else int(v) for v in value.split(',')] if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or generate query load against the search paths")
+    parser.add_argument('--log', help="Query log to replay (text or JSONL)")
+    parser.add_argument('--zipf-exponent', type=float, default=1.1)
+    parser.add_argument('--backend', default='local', choices=['local', 'quick_test'],
+                        help="local: offline LocalBackend; quick_test: real test_documents search")
+    parser.add_argument('--target', default='all', choices=['all', 'vector_search', 'test_search', 'smart_query'])
+    parser.add_argument('--qps', default=None, help="Comma-separated open-loop QPS steps")
+    parser.add_argument('--concurrency', default=None, help="Comma-separated closed-loop client counts")
+    parser.add_argument('--step-seconds', type=float, default=5.0)
+    parser.add_argument('--latency', type=float, default=0.05, help="LocalBackend base latency (s)")
+    parser.add_argument('--capacity', type=int, default=8, help="LocalBackend concurrent slots")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    qps_steps = _parse_steps(args.qps)
+    concurrency_steps = _parse_steps(args.concurrency)
+    if qps_steps is None and concurrency_steps is None:
+        qps_steps = [10, 25, 50, 100, 200]
+
+    queries = load_query_log(args.log) if args.log else zipf_queries(
+        DEFAULT_QUERIES, 10_000, exponent=args.zipf_exponent)
+
+    print(f"🚦 QUERY LOAD GENERATOR - {args.backend.upper()} BACKEND")
+    print("=" * 70)
+    print(f"📝 Queries: {'log ' + args.log if args.log else 'Zipf over demo vocabulary'} ({len(queries):,})")
+
+    if args.backend == 'quick_test':
+        targets = quick_test_targets()
+    else:
+        print(f"🖥️  Backend: {args.latency * 1000:.0f} ms base latency, {args.capacity} slots")
+        backend = LocalBackend(base_latency=args.latency, capacity=args.capacity, error_rate=args.error_rate)
+        targets = backend_targets(backend)
+    names = list(targets) if args.target == 'all' else [args.target]
+    if any(name not in targets for name in names):
+        parser.error(f"--target {args.target} is not available on the {args.backend} backend")
+
+    for name in names:
+        print(f"\n🎯 Target: {name}")
+        report = ramp_load(targets[name], queries, qps_steps=qps_steps,
+                           concurrency_steps=concurrency_steps, step_duration=args.step_seconds,
+                           is_error=TARGET_ERROR_CHECKS.get(name))
+        print(report.round(2).to_string(index=False))
+        print(f"   🧱 {saturation_point(report)}")
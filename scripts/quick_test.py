@@ -2,68 +2,76 @@
 # Test the Smart Document Discovery Engine with files in your current project
 
 import os
+import sys
+import json
+import hashlib
 import pandas as pd
 from pathlib import Path
 from google.cloud import bigquery
+from document_store import DocumentStoreBuilder, PROJECT_FILE_SCHEMA
+from keyword_classifier import classify_text
 
 # Your existing BigQuery setup
 PROJECT_ID = os.getenv('GOOGLE_CLOUD_PROJECT', 'ultra-component-436418-g2')
 DATASET_ID = 'kaggle_competition'
 client = bigquery.Client(project=PROJECT_ID)
 
+MAX_FILE_BYTES = 1000000  # Skip files > 1MB
+MANIFEST_FILENAME = '.quick_test_manifest.json'
+
 def load_project_files(folder_path):
     """Load documents from your project folder"""
-    documents = []
+    return load_project_store(folder_path).to_dataframe()
+
+def load_project_store(folder_path):
+    """Load documents from your project folder into a compact columnar store"""
+    documents = DocumentStoreBuilder(PROJECT_FILE_SCHEMA)
     
+    for file_path, ext in project_files(folder_path):
+        try:
+            # Skip very large files
+            if file_path.stat().st_size > MAX_FILE_BYTES:
+                continue
+                
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+                
+            # Skip empty files
+            if len(content.strip()) < 10:
+                continue
+                
+            documents.append(document_record(file_path, ext, content, len(documents) + 1))
+        except Exception as e:
+            print(f"⚠️  Skipped {file_path.name}: {e}")
+                
+    return documents.build()
+
+def project_files(folder_path):
+    """Yield (path, extension) for every supported file in the folder"""
     # File types to include
     extensions = ['.txt', '.md', '.py', '.sql', '.json', '.ipynb']
     
     for ext in extensions:
         for file_path in Path(folder_path).glob(f'*{ext}'):  # Only current folder, not recursive
-            try:
-                # Skip very large files
-                if file_path.stat().st_size > 1000000:  # Skip files > 1MB
-                    continue
-                    
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                # Skip empty files
-                if len(content.strip()) < 10:
-                    continue
-                    
-                documents.append({
-                    'document_id': len(documents) + 1,
-                    'title': file_path.name,
-                    'full_text': content[:5000],  # Limit to first 5000 chars
-                    'file_path': str(file_path),
-                    'file_type': ext,
-                    'length': len(content),
-                    'category': categorize_file(file_path.name, content),
-                    'relevance_score': min(len(content) / 1000.0, 10.0)  # Cap at 10
-                })
-            except Exception as e:
-                print(f"⚠️  Skipped {file_path.name}: {e}")
-                
-    return pd.DataFrame(documents)
+            if file_path.name != MANIFEST_FILENAME:
+                yield file_path, ext
+
+def document_record(file_path, ext, content, document_id):
+    """Build one test_documents row from a file's content"""
+    return {
+        'document_id': document_id,
+        'title': file_path.name,
+        'full_text': content[:5000],  # Limit to first 5000 chars
+        'file_path': str(file_path),
+        'file_type': ext,
+        'length': len(content),
+        'category': categorize_file(file_path.name, content),
+        'relevance_score': min(len(content) / 1000.0, 10.0)  # Cap at 10
+    }
 
 def categorize_file(filename, content):
-    """Categorize files based on name and content"""
-    filename_lower = filename.lower()
-    content_lower = content.lower()
-    
-    if '.py' in filename_lower or 'import ' in content[:200]:
-        return 'Python Code'
-    elif '.sql' in filename_lower or 'select' in content_lower:
-        return 'SQL Scripts'
-    elif '.md' in filename_lower or filename_lower.endswith('.txt'):
-        return 'Documentation'
-    elif '.json' in filename_lower:
-        return 'Configuration'
-    elif '.ipynb' in filename_lower:
-        return 'Jupyter Notebook'
-    else:
-        return 'General Files'
+    """Categorize files based on name and content (one pass, see keyword_classifier.RULE_TABLE)"""
+    return classify_text(content, filename=filename, groups=['file_category'])['file_category']
 
 def upload_test_documents(documents_df):
     """Upload project files to BigQuery for testing"""
@@ -92,6 +100,173 @@ def upload_test_documents(documents_df):
         print(f"❌ Upload failed: {e}")
         return None
 
+TEST_DOCUMENTS_SCHEMA = [
+    bigquery.SchemaField('document_id', 'INT64'),
+    bigquery.SchemaField('title', 'STRING'),
+    bigquery.SchemaField('full_text', 'STRING'),
+    bigquery.SchemaField('file_path', 'STRING'),
+    bigquery.SchemaField('file_type', 'STRING'),
+    bigquery.SchemaField('length', 'INT64'),
+    bigquery.SchemaField('category', 'STRING'),
+    bigquery.SchemaField('relevance_score', 'FLOAT64'),
+]
+
+def load_manifest(manifest_path):
+    """Read the sync manifest: {'next_id': int, 'files': {path: entry}}"""
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest, manifest_path):
+    """Write the manifest atomically so a crash never leaves it half-written"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def invalidate_manifest(manifest_path):
+    """Forget sync state after a full upload renumbered the table"""
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+def scan_project_changes(folder_path, manifest):
+    """
+    Compare the folder against the manifest.
+    
+    Files whose size and mtime match the manifest are not re-read. Changed
+    files are hashed; a file whose content hash is unchanged (e.g. touched)
+    is not uploaded. Document IDs stay with their path across runs.
+    Returns (upserts, deleted_ids, new_manifest).
+    """
+    old_files = manifest['files'] if manifest else {}
+    new_files = {}
+    next_id = manifest['next_id'] if manifest else 1
+    upserts = []
+    
+    for file_path, ext in project_files(folder_path):
+        path_key = str(file_path)
+        try:
+            stat = file_path.stat()
+            if stat.st_size > MAX_FILE_BYTES:
+                continue
+            
+            entry = old_files.get(path_key)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                new_files[path_key] = entry
+                continue
+            
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            content_hash = hashlib.sha256(raw).hexdigest()
+            # Same newline handling as reading in text mode
+            content = raw.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+            
+            # Skip empty files
+            if len(content.strip()) < 10:
+                continue
+            
+            if entry:
+                document_id = entry['document_id']
+            else:
+                document_id = next_id
+                next_id += 1
+            
+            new_files[path_key] = {
+                'document_id': document_id,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': content_hash,
+            }
+            if not entry or entry['sha256'] != content_hash:
+                upserts.append(document_record(file_path, ext, content, document_id))
+        except Exception as e:
+            print(f"⚠️  Skipped {file_path.name}: {e}")
+            if path_key in old_files:
+                new_files[path_key] = old_files[path_key]
+    
+    deleted_ids = [entry['document_id'] for path, entry in old_files.items() if path not in new_files]
+    return upserts, deleted_ids, {'next_id': next_id, 'files': new_files}
+
+def sync_test_documents(folder_path, manifest_path=None):
+    """
+    Incrementally sync project files into the test_documents table.
+    
+    Only inserted, updated and deleted files are uploaded: changes are loaded
+    into a staging table and applied with a single MERGE. The first sync
+    (no manifest yet) replaces the table, like upload_test_documents.
+    """
+    manifest_path = manifest_path or os.path.join(folder_path, MANIFEST_FILENAME)
+    manifest = load_manifest(manifest_path)
+    upserts, deleted_ids, new_manifest = scan_project_changes(folder_path, manifest)
+    
+    table_id = f"{PROJECT_ID}.{DATASET_ID}.test_documents"
+    summary = {
+        'table_id': table_id,
+        'files': len(new_manifest['files']),
+        'upserted': len(upserts),
+        'deleted': len(deleted_ids),
+    }
+    print(f"🔄 Sync: {summary['files']} files tracked, "
+          f"{len(upserts)} new/changed, {len(deleted_ids)} deleted")
+    
+    upserts_df = DocumentStoreBuilder(PROJECT_FILE_SCHEMA).extend(upserts).build().to_dataframe()
+    
+    try:
+        if manifest is None:
+            job_config = bigquery.LoadJobConfig(
+                write_disposition="WRITE_TRUNCATE",
+                schema=TEST_DOCUMENTS_SCHEMA
+            )
+            client.load_table_from_dataframe(upserts_df, table_id, job_config=job_config).result()
+            print(f"✅ Initial sync uploaded {len(upserts_df)} documents")
+        elif upserts or deleted_ids:
+            apply_staged_changes(upserts_df, deleted_ids, table_id)
+            print(f"✅ Merged {len(upserts)} upserts and {len(deleted_ids)} deletes")
+        else:
+            print("✅ Already up to date - nothing to upload")
+    except Exception as e:
+        print(f"❌ Sync failed: {e}")
+        return None
+    
+    # Only record the new state once BigQuery has accepted it
+    save_manifest(new_manifest, manifest_path)
+    return summary
+
+def apply_staged_changes(upserts_df, deleted_ids, table_id):
+    """Load changes into a staging table and MERGE them into the target"""
+    staging_id = f"{table_id}_staging"
+    
+    deletes_df = pd.DataFrame({'document_id': pd.Series(deleted_ids, dtype='int64')})
+    staged_df = pd.concat([
+        upserts_df.assign(_op='upsert'),
+        deletes_df.assign(_op='delete'),
+    ], ignore_index=True)
+    
+    job_config = bigquery.LoadJobConfig(
+        write_disposition="WRITE_TRUNCATE",
+        schema=TEST_DOCUMENTS_SCHEMA + [bigquery.SchemaField('_op', 'STRING')]
+    )
+    client.load_table_from_dataframe(staged_df, staging_id, job_config=job_config).result()
+    
+    columns = [field.name for field in TEST_DOCUMENTS_SCHEMA]
+    update_set = ',\n                '.join(f"{c} = S.{c}" for c in columns if c != 'document_id')
+    merge_sql = f"""
+        MERGE `{table_id}` T
+        USING `{staging_id}` S
+        ON T.document_id = S.document_id
+        WHEN MATCHED AND S._op = 'delete' THEN
+            DELETE
+        WHEN MATCHED THEN
+            UPDATE SET
+                {update_set}
+        WHEN NOT MATCHED AND S._op = 'upsert' THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join('S.' + c for c in columns)})
+    """
+    client.query(merge_sql).result()
+    client.delete_table(staging_id, not_found_ok=True)
+
 def search_test_documents(query_text, top_k=3):
     """Search your uploaded test documents"""
     
@@ -134,7 +309,7 @@ def search_test_documents(query_text, top_k=3):
         return None
 
 # 🚀 MAIN TEST FUNCTION - RUN THIS!
-def run_quick_test():
+def run_quick_test(incremental=False):
     print("🧪 QUICK TEST: Smart Document Discovery with YOUR Project Files")
     print("="*70)
     
@@ -142,24 +317,36 @@ def run_quick_test():
     current_dir = os.getcwd()
     print(f"📁 Testing with files in: {current_dir}")
     
-    # Load files from current project
-    print("\n📄 Loading project files...")
-    project_docs = load_project_files(current_dir)
-    
-    if len(project_docs) == 0:
-        print("❌ No suitable files found in current directory!")
-        print("Make sure you have .txt, .md, .py, .sql, .json, or .ipynb files")
-        return
-    
-    print(f"✅ Found {len(project_docs)} files:")
-    print(project_docs[['title', 'category', 'file_type', 'length']].to_string())
-    
-    # Upload to BigQuery
-    print(f"\n📤 Uploading to BigQuery...")
-    table_id = upload_test_documents(project_docs)
-    
-    if table_id is None:
-        return
+    if incremental:
+        # Upload only what changed since the last run
+        print("\n🔄 Syncing changed project files...")
+        project_docs = sync_test_documents(current_dir)
+        
+        if project_docs is None:
+            return
+    else:
+        # Load files from current project
+        print("\n📄 Loading project files...")
+        project_docs = load_project_files(current_dir)
+        
+        if len(project_docs) == 0:
+            print("❌ No suitable files found in current directory!")
+            print("Make sure you have .txt, .md, .py, .sql, .json, or .ipynb files")
+            return
+        
+        print(f"✅ Found {len(project_docs)} files:")
+        print(project_docs[['title', 'category', 'file_type', 'length']].to_string())
+        
+        # Upload to BigQuery
+        print(f"\n📤 Uploading to BigQuery...")
+        table_id = upload_test_documents(project_docs)
+        
+        if table_id is None:
+            return
+        
+        # Full uploads number documents by scan order, so the next --sync
+        # must start over instead of MERGEing stale manifest IDs
+        invalidate_manifest(os.path.join(current_dir, MANIFEST_FILENAME))
     
     # Test searches
     print(f"\n🔍 Testing searches on your project files...")
@@ -188,5 +375,5 @@ def run_quick_test():
     return project_docs
 
 if __name__ == "__main__":
-    # Run the test
-    test_results = run_quick_test()
+    # Run the test (--sync uploads only changed files)
+    test_results = run_quick_test(incremental='--sync' in sys.argv)
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Long-Lived Search Service
+===========================================================
+
+An asyncio JSON search server that keeps the corpus and embedding vectors warm
+in memory and ranks with the same hybrid score as `legal_vector_search` /
+`execute_vector_search` (content 0.7, title 0.2, court authority 0.1).
+
+    • corpus held in a ColumnarDocumentStore, vectors in NumPy matrices
+      (optionally sharded across processes with ShardedSearchExecutor;
+      concurrent queries are batched into one broadcast to the shards)
+    • identical in-flight queries are coalesced into a single execution
+    • near-identical queries are answered from the SemanticResultCache
+    • JSON API with health and metrics endpoints
+
+Endpoints:
+    GET  /health
+    GET  /metrics
+    GET  /search?q=<query>&top_k=5
+    POST /search        {"query": "...", "top_k": 5}
+
+Usage:
+    python scripts/search_server.py --project my-project --dataset enterprise_documents
+    python scripts/search_server.py --offline --documents legal_documents.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from document_store import ColumnarDocumentStore, LEGAL_DOCUMENT_SCHEMA
+from embedding_jobs import BigQueryEmbeddingProvider, LocalHashEmbeddingProvider
+from semantic_cache import SemanticResultCache
+from sharded_search import (ShardedSearchExecutor, court_authority_weight, normalize_rows,
+                            score_block, top_k_rows)
+
+MAX_TOP_K = 100
+MAX_BODY_BYTES = 64 * 1024
+
+
+class _PendingSearch:
+    """One query waiting for the next sharded search_batch"""
+    __slots__ = ('query_vector', 'top_k', 'hits', 'error', 'done')
+
+    def __init__(self, query_vector, top_k):
+        self.query_vector = query_vector
+        self.top_k = top_k
+        self.hits = None
+        self.error = None
+        self.done = False
+
+
+class SearchIndex:
+    """Warm in-memory corpus + vectors, ranked like legal_vector_search"""
+
+    def __init__(self, store, content_vectors, title_vectors=None, n_workers=1):
+        self.store = store
+        self.content = normalize_rows(content_vectors)
+        self.title = normalize_rows(title_vectors) if title_vectors is not None else None
+        self.authority = np.array(
+            [court_authority_weight(court) for court in store.column('court')], dtype=np.float32)
+        self.version = f"{len(store)}:{time.time():.0f}"
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        if n_workers > 1:
+            self._executor = ShardedSearchExecutor(
+                self.content, title_embeddings=self.title,
+                courts=list(store.column('court')), n_workers=n_workers)
+
+    @classmethod
+    def from_bigquery(cls, client, project_id, dataset_id, n_workers=1):
+        """Load `document_embeddings` (documents + both embeddings) into memory"""
+        load_sql = f"""
+        SELECT doc_id, title, content, category, court, case_name, jurisdiction,
+               word_count, content_embedding, title_embedding
+        FROM `{project_id}.{dataset_id}.document_embeddings`
+        """
+        rows = list(client.query(load_sql).result())
+        store = ColumnarDocumentStore.from_records(
+            ({**dict(row.items()), 'creation_date': None} for row in rows), LEGAL_DOCUMENT_SCHEMA)
+        content = np.array([row.content_embedding for row in rows], dtype=np.float32)
+        title = np.array([row.title_embedding for row in rows], dtype=np.float32)
+        return cls(store, content, title, n_workers=n_workers)
+
+    @classmethod
+    def from_documents(cls, documents, provider, n_workers=1):
+        """Embed legal_documents-shaped dicts with `provider` (offline mode)"""
+        store = ColumnarDocumentStore.from_records(documents, LEGAL_DOCUMENT_SCHEMA)
+        content = np.array(provider.embed(store.column('content')), dtype=np.float32)
+        titles = [f"{doc['title']} {doc['case_name']}" for doc in store]
+        title = np.array(provider.embed(titles), dtype=np.float32)
+        return cls(store, content, title, n_workers=n_workers)
+
+    def search(self, query_vector, top_k=5):
+        if self._executor is not None:
+            hits = self._sharded_search(query_vector, top_k)
+        else:
+            scores = score_block(normalize_rows(query_vector), self.content, self.title, self.authority)
+            hits = top_k_rows(scores, top_k)[0]
+
+        results = []
+        for score, row in hits:
+            doc = self.store[row]
+            results.append({
+                'doc_id': doc['doc_id'],
+                'title': doc['title'],
+                'case_name': doc['case_name'],
+                'court': doc['court'],
+                'similarity_score': score,
+                'content_preview': (doc['content'] or '')[:200],
+            })
+        return results
+
+    def _sharded_search(self, query_vector, top_k):
+        """
+        Queue the query, then take the executor: whoever holds it runs every
+        query queued so far in one search_batch broadcast, so requests that
+        arrive while a batch is running share the next one.
+        """
+        request = _PendingSearch(query_vector, top_k)
+        with self._pending_lock:
+            self._pending.append(request)
+
+        with self._executor_lock:
+            if not request.done:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                self._run_batch(batch)
+
+        if request.error is not None:
+            raise request.error
+        return request.hits
+
+    def _run_batch(self, batch):
+        top_k = max(request.top_k for request in batch)
+        try:
+            results = self._executor.search_batch([request.query_vector for request in batch], top_k=top_k)
+        except Exception as e:
+            results = None
+            for request in batch:
+                request.error = e
+        for index, request in enumerate(batch):
+            if results is not None:
+                # Merged hits are sorted, so a prefix is that query's own top-k
+                request.hits = [(hit['similarity_score'], hit['row'])
+                                for hit in results[index][:request.top_k]]
+            request.done = True
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.close()
+
+
+class SearchService:
+    """Query embedding, caching and request coalescing around a SearchIndex"""
+
+    def __init__(self, index, provider, cache=None, max_workers=8):
+        self.index = index
+        self.provider = provider
+        self.cache = cache or SemanticResultCache(threshold=0.95, capacity=4096,
+                                                  table_version=index.version)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = {}
+        self._latencies = deque(maxlen=10_000)
+        self.started_at = time.time()
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def _execute(self, query_text, top_k):
+        query_vector = self.provider.embed([query_text])[0]
+        results = self.cache.lookup(query_vector, top_k, table_version=self.index.version)
+        if results is None:
+            results = self.index.search(query_vector, top_k)
+            self.cache.store(query_vector, results, top_k, table_version=self.index.version)
+        return results
+
+    async def search(self, query_text, top_k=5):
+        self.requests += 1
+        start = time.perf_counter()
+        # Exact text: the execution embeds the first caller's query, so only
+        # identical requests may share it (variants still hit the semantic cache)
+        key = (query_text, top_k)
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool, self._execute, query_text, top_k)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._latencies.append((time.perf_counter() - start) * 1000)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'documents': len(self.index.store),
+            'index_version': self.index.version,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+        }
+
+    def metrics(self):
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        return {
+            'requests': self.requests,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'in_flight': len(self._in_flight),
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p99_ms': float(np.percentile(latencies, 99)),
+            'cache': self.cache.metrics(),
+            'memory': {
+                'documents_bytes': self.index.store.memory_usage()['total_bytes'],
+                'vectors_bytes': self.index.content.nbytes + (
+                    self.index.title.nbytes if self.index.title is not None else 0),
+            },
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.index.close()
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise _HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise _HttpError(400, "Content-Length must be an integer")
+    if length < 0:
+        raise _HttpError(400, "Content-Length must not be negative")
+    if length > MAX_BODY_BYTES:
+        raise _HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, default=str).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+
+
+def _parse_search(method, target, body):
+    if method == 'GET':
+        params = parse_qs(urlsplit(target).query)
+        query = params.get('q', [''])[0]
+        top_k = params.get('top_k', ['5'])[0]
+    elif method == 'POST':
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise _HttpError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise _HttpError(400, "Body must be a JSON object")
+        query = payload.get('query', '')
+        top_k = payload.get('top_k', 5)
+    else:
+        raise _HttpError(405, "Use GET or POST")
+
+    try:
+        top_k = int(top_k)
+    except (TypeError, ValueError):
+        raise _HttpError(400, "top_k must be an integer")
+    if not isinstance(query, str) or not query.strip():
+        raise _HttpError(400, "query is required")
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise _HttpError(400, f"top_k must be between 1 and {MAX_TOP_K}")
+    return query, top_k
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except _HttpError as e:
+                    _write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, target, version, headers, body = request
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                path = urlsplit(target).path
+                try:
+                    if path == '/health':
+                        status, payload = 200, service.health()
+                    elif path == '/metrics':
+                        status, payload = 200, service.metrics()
+                    elif path == '/search':
+                        query, top_k = _parse_search(method, target, body)
+                        results = await service.search(query, top_k)
+                        status, payload = 200, {'query': query, 'top_k': top_k, 'results': results}
+                    else:
+                        raise _HttpError(404, f"Unknown path: {path}")
+                except _HttpError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': repr(e)}
+
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(service, host='127.0.0.1', port=8080):
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"🚀 Search service listening on http://{host}:{port} "
+          f"({len(service.index.store)} documents warm)")
+    async with server:
+        await server.serve_forever()
+
+
+def _load_documents(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm in-memory legal document search service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--project', default='bigquery-ai-hackathon')
+    parser.add_argument('--dataset', default='enterprise_documents')
+    parser.add_argument('--offline', action='store_true',
+                        help="Use a local JSONL corpus and hashing embeddings instead of BigQuery")
+    parser.add_argument('--documents', help="JSONL file of legal_documents records (offline mode)")
+    parser.add_argument('--workers', type=int, default=1, help="Search shards (processes)")
+    args = parser.parse_args()
+
+    print("⚖️  LEGAL DOCUMENT SEARCH SERVICE")
+    print("=" * 60)
+
+    if args.offline:
+        if not args.documents:
+            parser.error("--offline requires --documents")
+        provider = LocalHashEmbeddingProvider()
+        index = SearchIndex.from_documents(_load_documents(args.documents), provider, n_workers=args.workers)
+    else:
+        from google.cloud import bigquery
+        client = bigquery.Client(project=args.project)
+        provider = BigQueryEmbeddingProvider(
+            client, f"{args.project}.{args.dataset}.text_embedding_model")
+        index = SearchIndex.from_bigquery(client, args.project, args.dataset, n_workers=args.workers)
+
+    service = SearchService(index, provider)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Search service stopped")
+    finally:
+        service.close()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Semantic Result Cache
+=======================================================
+
+Caches top-k search results keyed by the QUERY EMBEDDING rather than the query
+string, so re-phrasings such as
+
+    "constitutional privacy rights digital communications"
+    "digital communications privacy constitutional rights"
+
+are served from memory when their cosine similarity to a cached query exceeds
+the configured threshold.
+
+    • bounded capacity with LRU eviction
+    • every entry is invalidated when the embeddings table version changes
+    • hit / miss / eviction / invalidation metrics
+
+Usage:
+    cache = SemanticResultCache(threshold=0.95, capacity=1024)
+    results = cached_vector_search(query, 5, cache, embed_fn, execute_vector_search,
+                                   table_version=embeddings_table_version(client, table_id))
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def embeddings_table_version(client, table_id):
+    """Version token for a BigQuery table: changes whenever the table is rewritten"""
+    table = client.get_table(table_id)
+    modified = table.modified.isoformat() if table.modified else None
+    return f"{modified}:{table.num_rows}"
+
+
+class SemanticResultCache:
+    """Thread-safe LRU cache of search results, matched by query-vector cosine"""
+
+    def __init__(self, threshold=0.95, capacity=1024, table_version=None):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.threshold = threshold
+        self.capacity = capacity
+        self.table_version = table_version
+
+        self._lock = threading.Lock()
+        self._vectors = None                 # (capacity, dim) unit vectors, allocated lazily
+        self._entries = OrderedDict()        # slot -> (results, top_k), LRU order
+        self._free_slots = list(range(capacity - 1, -1, -1))
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._free_slots = list(range(self.capacity - 1, -1, -1))
+
+    def _check_version_locked(self, table_version):
+        if table_version is not None and table_version != self.table_version:
+            if self._entries:
+                self.invalidations += 1
+            self._clear_locked()
+            self.table_version = table_version
+
+    def set_table_version(self, table_version):
+        """Record the current embeddings table version, dropping stale entries"""
+        with self._lock:
+            self._check_version_locked(table_version)
+
+    def invalidate(self):
+        """Drop every cached entry"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._clear_locked()
+
+    def lookup(self, query_vector, top_k, table_version=None):
+        """Cached top-k results for a near-identical query, or None on a miss"""
+        query = self._normalize(query_vector)
+        with self._lock:
+            self._check_version_locked(table_version)
+            if not self._entries or self._vectors.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+            similarities = self._vectors[slots] @ query
+
+            # Best match that holds at least top_k results
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.threshold:
+                    break
+                slot = int(slots[index])
+                results, cached_k = self._entries[slot]
+                if cached_k >= top_k:
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return list(results[:top_k])
+
+            self.misses += 1
+            return None
+
+    def store(self, query_vector, results, top_k, table_version=None):
+        """Cache `results` (the top-k answer) for `query_vector`"""
+        query = self._normalize(query_vector)
+        with self._lock:
+            self._check_version_locked(table_version)
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                self._vectors = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+                self._clear_locked()
+
+            if not self._free_slots:
+                evicted_slot, _ = self._entries.popitem(last=False)
+                self._free_slots.append(evicted_slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = query
+            self._entries[slot] = (list(results), top_k)
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'threshold': self.threshold,
+                'table_version': self.table_version,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def cached_vector_search(query_text, top_k, cache, embed_fn, search_fn, table_version=None):
+    """
+    Serve `query_text` from `cache` when a near-identical query was seen,
+    otherwise run `search_fn(query_text, top_k)` (e.g. execute_vector_search)
+    and cache its results. `embed_fn(text)` returns the query embedding.
+    """
+    query_vector = embed_fn(query_text)
+    results = cache.lookup(query_vector, top_k, table_version=table_version)
+    if results is not None:
+        return results
+
+    results = search_fn(query_text, top_k)
+    if results:
+        cache.store(query_vector, results, top_k, table_version=table_version)
+    return results
+
+
+if __name__ == "__main__":
+    from embedding_jobs import LocalHashEmbeddingProvider
+
+    print("🧠 SEMANTIC RESULT CACHE - OFFLINE DEMO")
+    print("=" * 60)
+
+    provider = LocalHashEmbeddingProvider(dim=256)
+    searches = []
+
+    def fake_search(query_text, top_k):
+        searches.append(query_text)
+        return [{'doc_id': f"doc_{i}", 'similarity_score': 1.0 - i * 0.1} for i in range(top_k)]
+
+    cache = SemanticResultCache(threshold=0.95, capacity=2)
+    queries = [
+        "constitutional privacy rights digital communications",
+        "digital communications privacy constitutional rights",
+        "patent enforcement intellectual property litigation",
+        "corporate governance fiduciary duty",
+        "constitutional privacy rights digital communications",
+    ]
+    for query in queries:
+        cached_vector_search(query, 3, cache, provider.embed_text, fake_search, table_version="v1")
+        print(f"🔎 {query!r} -> searches so far: {len(searches)}")
+
+    cache.set_table_version("v2")
+    print(f"\n📊 Cache metrics: {cache.metrics()}")
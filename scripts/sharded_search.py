@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Smart Document Discovery Engine - Multi-Core Sharded Vector Search
+==================================================================
+
+In-process cosine search over the `document_embeddings` vectors, spread across
+worker processes. The embedding matrices are copied ONCE into shared memory;
+each worker attaches to its own row range (shard) and never receives a copy of
+the corpus. Query batches are written into a shared query buffer and broadcast
+to every worker, which returns only its local top-k; the parent merges the
+per-shard top-k heaps into the global ranking.
+
+Scoring mirrors the `legal_vector_search` BigQuery function:
+
+    final_similarity = content_similarity * 0.7
+                     + title_similarity   * 0.2
+                     + authority_weight   * 0.1      (WHERE content_similarity > 0.1)
+
+Usage:
+    executor = ShardedSearchExecutor(content_vectors, doc_ids, n_workers=8)
+    hits = executor.search(query_vector, top_k=5)
+    executor.close()
+
+    python scripts/sharded_search.py      # scaling benchmark on a synthetic corpus
+"""
+
+import heapq
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+CONTENT_WEIGHT = 0.7
+TITLE_WEIGHT = 0.2
+AUTHORITY_WEIGHT = 0.1
+MIN_CONTENT_SIMILARITY = 0.1
+
+# Keep every worker single-threaded so that cores map 1:1 onto shards
+_SINGLE_THREAD_ENV = {
+    'OMP_NUM_THREADS': '1',
+    'OPENBLAS_NUM_THREADS': '1',
+    'MKL_NUM_THREADS': '1',
+    'VECLIB_MAXIMUM_THREADS': '1',
+    'NUMEXPR_NUM_THREADS': '1',
+}
+
+
+def court_authority_weight(court):
+    """Legal authority weight, same CASE ladder as legal_vector_search"""
+    court_lower = (court or '').lower()
+    if 'supreme' in court_lower:
+        return 2.0
+    elif 'appeals' in court_lower or 'circuit' in court_lower:
+        return 1.5
+    elif 'district' in court_lower:
+        return 1.0
+    else:
+        return 0.5
+
+
+def normalize_rows(vectors):
+    """Return float32 copy of `vectors` with unit-length rows (zero rows stay zero)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def score_block(queries, content, title=None, authority=None):
+    """
+    Hybrid legal similarity for a block of documents.
+
+    `queries` and the document matrices must already be row-normalized, so the
+    dot product is the cosine similarity (1 - ML.DISTANCE(..., 'COSINE')).
+    Documents under the content similarity floor get -inf.
+    """
+    content_similarity = queries @ content.T
+    scores = content_similarity * CONTENT_WEIGHT
+    if title is not None:
+        scores += (queries @ title.T) * TITLE_WEIGHT
+    if authority is not None:
+        scores += authority[np.newaxis, :] * AUTHORITY_WEIGHT
+    scores[content_similarity <= MIN_CONTENT_SIMILARITY] = -np.inf
+    return scores
+
+
+def top_k_rows(scores, top_k, offset=0):
+    """Per-row top-k of a score block as lists of (score, global_row) pairs"""
+    n_docs = scores.shape[1]
+    k = min(top_k, n_docs)
+    if k == 0:
+        return [[] for _ in range(scores.shape[0])]
+
+    if k < n_docs:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(n_docs), (scores.shape[0], 1))
+
+    results = []
+    for row, cols in enumerate(candidates):
+        row_scores = scores[row, cols]
+        order = np.argsort(-row_scores, kind='stable')
+        results.append([
+            (float(row_scores[i]), int(cols[i]) + offset)
+            for i in order if np.isfinite(row_scores[i])
+        ])
+    return results
+
+
+def merge_shard_results(shard_results, top_k):
+    """Merge the per-shard top-k heaps (each sorted descending) into one top-k"""
+    merged = heapq.merge(*shard_results, key=lambda hit: (-hit[0], hit[1]))
+    return [hit for _, hit in zip(range(top_k), merged)]
+
+
+class _SharedArray:
+    """A numpy array living in a named shared memory block"""
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(self.shape, dtype=array.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.shape, self.dtype)
+
+    def release(self):
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(spec):
+    """Attach to a shared array described by `_SharedArray.spec` (no copy)"""
+    if spec is None:
+        return None, None
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _shard_worker(conn, start, stop, content_spec, title_spec, authority_spec, query_spec):
+    """Worker loop: score broadcast query batches against rows [start, stop)"""
+    handles = []
+    try:
+        shm, content = _attach(content_spec)
+        handles.append(shm)
+        shm, title = _attach(title_spec)
+        handles.append(shm)
+        shm, authority = _attach(authority_spec)
+        handles.append(shm)
+        shm, query_buffer = _attach(query_spec)
+        handles.append(shm)
+
+        # Views only - slicing shared memory does not copy the shard
+        content = content[start:stop]
+        title = title[start:stop] if title is not None else None
+        authority = authority[start:stop] if authority is not None else None
+        conn.send(('ready', stop - start))
+
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            n_queries, top_k = message
+            try:
+                scores = score_block(query_buffer[:n_queries], content, title, authority)
+                conn.send(('ok', top_k_rows(scores, top_k, offset=start)))
+            except Exception as e:
+                conn.send(('error', repr(e)))
+    finally:
+        content = title = authority = query_buffer = None
+        for handle in handles:
+            if handle is not None:
+                handle.close()
+        conn.close()
+
+
+class ShardedSearchExecutor:
+    """
+    Multi-process cosine search over shared-memory embedding shards.
+
+    The corpus is split into `n_workers` contiguous row ranges. Each worker
+    process is pinned to a single BLAS thread and scores only its own shard,
+    so throughput scales with the number of cores up to memory bandwidth.
+    """
+
+    def __init__(self, content_embeddings, doc_ids=None, title_embeddings=None,
+                 courts=None, n_workers=None, max_batch_size=256):
+        content = normalize_rows(content_embeddings)
+        n_docs, dim = content.shape
+
+        if title_embeddings is not None:
+            title_embeddings = normalize_rows(title_embeddings)
+            if title_embeddings.shape != content.shape:
+                raise ValueError("title_embeddings must have the same shape as content_embeddings")
+        authority = None
+        if courts is not None:
+            if len(courts) != n_docs:
+                raise ValueError("courts must have one entry per document")
+            authority = np.array([court_authority_weight(c) for c in courts], dtype=np.float32)
+
+        self.doc_ids = list(doc_ids) if doc_ids is not None else list(range(n_docs))
+        if len(self.doc_ids) != n_docs:
+            raise ValueError("doc_ids must have one entry per document")
+
+        self.n_docs = n_docs
+        self.dim = dim
+        self.max_batch_size = max_batch_size
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_docs))
+
+        self._shared = [_SharedArray(content)]
+        self._title = _SharedArray(title_embeddings) if title_embeddings is not None else None
+        self._authority = _SharedArray(authority) if authority is not None else None
+        self._queries = _SharedArray(np.zeros((max_batch_size, dim), dtype=np.float32))
+        self._shared += [s for s in (self._title, self._authority, self._queries) if s is not None]
+
+        self._workers = []
+        self._connections = []
+        try:
+            self._start_workers()
+        except Exception:
+            self.close()
+            raise
+
+    def _start_workers(self):
+        ctx = mp.get_context('spawn')
+        bounds = np.linspace(0, self.n_docs, self.n_workers + 1).astype(int)
+        saved_env = {key: os.environ.get(key) for key in _SINGLE_THREAD_ENV}
+        os.environ.update(_SINGLE_THREAD_ENV)
+        try:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                parent_conn, child_conn = ctx.Pipe()
+                process = ctx.Process(
+                    target=_shard_worker,
+                    args=(child_conn, int(start), int(stop),
+                          self._shared[0].spec,
+                          self._title.spec if self._title else None,
+                          self._authority.spec if self._authority else None,
+                          self._queries.spec),
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                self._workers.append(process)
+                self._connections.append(parent_conn)
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        for conn in self._connections:
+            status, _ = conn.recv()
+            if status != 'ready':
+                raise RuntimeError("Search worker failed to start")
+
+    def search_batch(self, query_vectors, top_k=5):
+        """Search a batch of query vectors; returns one hit list per query"""
+        if not self._connections:
+            raise RuntimeError("ShardedSearchExecutor is closed")
+
+        queries = normalize_rows(query_vectors)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Query dimension {queries.shape[1]} != corpus dimension {self.dim}")
+
+        results = []
+        for begin in range(0, len(queries), self.max_batch_size):
+            chunk = queries[begin:begin + self.max_batch_size]
+            self._queries.array[:len(chunk)] = chunk
+
+            # Broadcast, then gather every shard's local top-k
+            for conn in self._connections:
+                conn.send((len(chunk), top_k))
+            shard_hits = []
+            for conn in self._connections:
+                status, payload = conn.recv()
+                if status != 'ok':
+                    raise RuntimeError(f"Search worker error: {payload}")
+                shard_hits.append(payload)
+
+            for query_index in range(len(chunk)):
+                merged = merge_shard_results([hits[query_index] for hits in shard_hits], top_k)
+                results.append([
+                    {'doc_id': self.doc_ids[row], 'row': row, 'similarity_score': score}
+                    for score, row in merged
+                ])
+        return results
+
+    def search(self, query_vector, top_k=5):
+        """Search a single query vector"""
+        return self.search_batch([query_vector], top_k=top_k)[0]
+
+    def close(self):
+        """Stop the workers and release the shared memory blocks"""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._workers = []
+        self._connections = []
+
+        for shared in self._shared:
+            shared.release()
+        self._shared = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def benchmark_scaling(content_embeddings, query_vectors, worker_counts=None,
+                      top_k=10, batch_size=64, rounds=3):
+    """
+    Measure search throughput for each worker count.
+
+    Returns a DataFrame with queries/sec, speedup over one worker and parallel
+    efficiency (speedup / workers; 1.0 is perfectly linear scaling).
+    """
+    if worker_counts is None:
+        cores = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+
+    query_vectors = np.asarray(query_vectors, dtype=np.float32)
+    rows = []
+    for n_workers in worker_counts:
+        with ShardedSearchExecutor(content_embeddings, n_workers=n_workers,
+                                   max_batch_size=batch_size) as executor:
+            executor.search_batch(query_vectors[:batch_size], top_k=top_k)  # warm-up
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                executor.search_batch(query_vectors, top_k=top_k)
+            elapsed = time.perf_counter() - start
+
+        rows.append({
+            'workers': executor.n_workers,
+            'queries': len(query_vectors) * rounds,
+            'seconds': elapsed,
+            'queries_per_sec': len(query_vectors) * rounds / elapsed,
+        })
+
+    report = pd.DataFrame(rows)
+    baseline = report['queries_per_sec'].iloc[0] / report['workers'].iloc[0]
+    report['speedup'] = report['queries_per_sec'] / baseline
+    report['efficiency'] = report['speedup'] / report['workers']
+    return report
+
+
+if __name__ == "__main__":
+    print("⚡ SHARDED VECTOR SEARCH - SCALING BENCHMARK")
+    print("=" * 60)
+
+    rng = np.random.default_rng(42)
+    n_docs, dim, n_queries = 200_000, 768, 512
+    print(f"📄 Synthetic corpus: {n_docs:,} documents x {dim} dimensions")
+    corpus = rng.standard_normal((n_docs, dim), dtype=np.float32)
+    # Perturbed copies of corpus rows, so queries clear the similarity floor
+    picks = rng.integers(0, n_docs, n_queries)
+    queries = corpus[picks] + 0.5 * rng.standard_normal((n_queries, dim), dtype=np.float32)
+
+    report = benchmark_scaling(corpus, queries)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))